@@ -1,14 +1,30 @@
+import time
+_START_TIME = time.perf_counter()  # Measured before the Qt import for time-to-first-image
+
 import sys
 import os
+import json
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QFileDialog, QHBoxLayout,
-    QVBoxLayout, QMessageBox, QRadioButton, QButtonGroup, QScrollArea
+    QVBoxLayout, QMessageBox, QListView, QAbstractItemView, QLineEdit
 )
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QColor, QPen
-from PyQt5.QtCore import Qt, QRect, QPoint
-import cv2
-from PyQt5.QtWidgets import QFontDialog
-from PyQt5.QtWidgets import QLineEdit
+from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtCore import Qt, QRect, QPoint, QStringListModel, QTimer
+
+SESSION_FILE = os.path.join(os.path.expanduser("~"), ".yolo_label_editor_session.json")
+FIRST_IMAGE_TARGET_S = 1.5  # Warn when startup -> first image takes longer than this
+
+_cv2 = None
+
+
+def lazy_cv2():
+    # cv2 is only needed once an image is shown, so keep it out of the startup path
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
 
 class YOLOLabelEditor(QWidget):
 
@@ -57,6 +73,7 @@ class YOLOLabelEditor(QWidget):
         self.btn_open_img = QPushButton("Open Image Folder")
         self.btn_open_lbl = QPushButton("Open Label Folder")
         self.btn_load_classes = QPushButton("Load Classes File")
+        self.btn_load_queue = QPushButton("Load Review Queue")
         self.btn_enable_draw = QPushButton("Enable Draw")
         self.btn_prev = QPushButton("Previous Image")
         self.btn_next = QPushButton("Next Image")
@@ -78,6 +95,7 @@ class YOLOLabelEditor(QWidget):
         self.btn_open_img.clicked.connect(self.open_image_folder)
         self.btn_open_lbl.clicked.connect(self.open_label_folder)
         self.btn_load_classes.clicked.connect(self.load_classes_file)
+        self.btn_load_queue.clicked.connect(self.load_review_queue)
         self.btn_prev.clicked.connect(self.prev_image)
         self.btn_next.clicked.connect(self.next_image)
         self.btn_enable_draw.clicked.connect(self.toggle_draw_mode)
@@ -90,20 +108,17 @@ class YOLOLabelEditor(QWidget):
         self.btn_jump.clicked.connect(self.jump_to_image)
 
         # --- Class Selection UI ---
-        self.class_radio_layout = QVBoxLayout()
-        self.class_button_group = QButtonGroup(self)
-        self.class_button_group.buttonToggled.connect(self.on_class_radio_toggled)
-
-        # Use a QWidget to hold the class radio buttons and then put it in a QScrollArea
-        self.class_selection_widget = QWidget()
-        self.class_selection_widget.setLayout(self.class_radio_layout)
-
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setWidget(self.class_selection_widget)
-        self.scroll_area.setFixedWidth(200) # Adjust width as needed
-
-        self.populate_class_radio_buttons() # Initial population
+        # Model-backed list: reloading classes only swaps the string list, no widgets are rebuilt
+        self.class_model = QStringListModel(self)
+        self.class_list_view = QListView()
+        self.class_list_view.setModel(self.class_model)
+        self.class_list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.class_list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.class_list_view.setUniformItemSizes(True)
+        self.class_list_view.setFixedWidth(200) # Adjust width as needed
+        self.class_list_view.selectionModel().currentChanged.connect(self.on_class_selected)
+
+        self.populate_class_list() # Initial population
 
         # --- Layouts ---
         nav_layout = QHBoxLayout()
@@ -117,6 +132,7 @@ class YOLOLabelEditor(QWidget):
         top_layout.addWidget(self.btn_open_img)
         top_layout.addWidget(self.btn_open_lbl)
         top_layout.addWidget(self.btn_load_classes) # Keep this button
+        top_layout.addWidget(self.btn_load_queue)
         top_layout.addWidget(self.btn_enable_draw)
 
         # Main layout now includes the class selection on the right
@@ -129,7 +145,7 @@ class YOLOLabelEditor(QWidget):
         image_and_nav_layout.addLayout(nav_layout)
 
         main_h_layout.addLayout(image_and_nav_layout)
-        main_h_layout.addWidget(self.scroll_area) # Add the scroll area with class selection
+        main_h_layout.addWidget(self.class_list_view) # Add the class selection list
 
         self.setLayout(main_h_layout) # Set the main horizontal layout
         self.showMaximized()  # Make the window open maximized
@@ -154,29 +170,53 @@ class YOLOLabelEditor(QWidget):
         self.crosshair_pos = QPoint()
         self.show_crosshair = False # Crosshair hidden by default
 
-    def populate_class_radio_buttons(self):
-        # Clear existing buttons
-        for i in reversed(range(self.class_radio_layout.count())):
-            widget = self.class_radio_layout.itemAt(i).widget()
-            if widget:
-                self.class_radio_layout.removeWidget(widget)
-                self.class_button_group.removeButton(widget)
-                widget.deleteLater()
-
-        # Add new radio buttons
-        for i, class_name in enumerate(self.label_classes):
-            radio_button = QRadioButton(f"{i}: {class_name}")
-            radio_button.class_id = i # Store the class ID
-            self.class_radio_layout.addWidget(radio_button)
-            self.class_button_group.addButton(radio_button, i) # Assign ID to the button in the group
-
-            # Set initial selection
-            if i == self.selected_class_id:
-                radio_button.setChecked(True)
-
-    def on_class_radio_toggled(self, button, checked):
-        if checked:
-            self.selected_class_id = self.class_button_group.id(button)
+        # Restore the last session once the window is on screen so it never delays the first paint
+        QTimer.singleShot(0, self.restore_session)
+
+    def restore_session(self):
+        try:
+            with open(SESSION_FILE, 'r') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return
+        lbl_folder = session.get("lbl_folder", "")
+        if lbl_folder and os.path.isdir(lbl_folder):
+            self.lbl_folder = lbl_folder
+        img_folder = session.get("img_folder", "")
+        if img_folder and os.path.isdir(img_folder):
+            self.set_image_folder(img_folder, session.get("image"))
+            if self.img_rgb is not None:
+                elapsed = time.perf_counter() - _START_TIME
+                print(f"Time to first image: {elapsed:.2f}s")
+                if elapsed > FIRST_IMAGE_TARGET_S:
+                    print(f"Warning: first image took longer than the {FIRST_IMAGE_TARGET_S:.1f}s target")
+
+    def save_session(self):
+        session = {
+            "img_folder": self.img_folder,
+            "lbl_folder": self.lbl_folder,
+            "image": self.img_files[self.current_index] if 0 <= self.current_index < len(self.img_files) else None,
+        }
+        try:
+            with open(SESSION_FILE, 'w') as f:
+                json.dump(session, f)
+        except OSError as e:
+            print(f"Could not save session: {e}")
+
+    def closeEvent(self, event):
+        self.save_session()
+        super().closeEvent(event)
+
+    def populate_class_list(self):
+        self.class_model.setStringList([f"{i}: {name}" for i, name in enumerate(self.label_classes)])
+        if not 0 <= self.selected_class_id < len(self.label_classes):
+            self.selected_class_id = 0
+        if self.label_classes:
+            self.class_list_view.setCurrentIndex(self.class_model.index(self.selected_class_id))
+
+    def on_class_selected(self, current, previous):
+        if current.isValid():
+            self.selected_class_id = current.row()
             print(f"Selected class ID: {self.selected_class_id} ({self.label_classes[self.selected_class_id]})")
 
 
@@ -264,14 +304,17 @@ class YOLOLabelEditor(QWidget):
     def open_image_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Image Folder")
         if folder:
-            self.img_folder = folder
-            self.img_files = sorted([f for f in os.listdir(folder)
-                                     if f.lower().endswith(('.jpg', '.png', '.jpeg'))])
-            if not self.img_files:
-                QMessageBox.warning(self, "Warning", "No image files found in folder")
-                return
-            self.current_index = 0
-            self.load_image_and_labels()
+            self.set_image_folder(folder)
+
+    def set_image_folder(self, folder, start_image=None):
+        self.img_folder = folder
+        self.img_files = sorted([f for f in os.listdir(folder)
+                                 if f.lower().endswith(('.jpg', '.png', '.jpeg'))])
+        if not self.img_files:
+            QMessageBox.warning(self, "Warning", "No image files found in folder")
+            return
+        self.current_index = self.img_files.index(start_image) if start_image in self.img_files else 0
+        self.load_image_and_labels()
 
     def open_label_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Label Folder")
@@ -288,11 +331,34 @@ class YOLOLabelEditor(QWidget):
                     self.label_classes = [line.strip() for line in f if line.strip()]
                 QMessageBox.information(self, "Classes Loaded",
                                         f"Loaded {len(self.label_classes)} classes.")
-                self.populate_class_radio_buttons() # Re-populate radio buttons
+                self.populate_class_list() # Re-populate class list
                 self.update_display()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load classes file:\n{e}")
 
+    def load_review_queue(self):
+        # Replace the alphabetical order with the ranking written by error_mining.py
+        if not self.img_folder:
+            QMessageBox.warning(self, "Warning", "Open the image folder before loading a review queue")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Select Review Queue", filter="Text Files (*.txt)")
+        if path:
+            try:
+                from error_mining import read_review_queue
+                queue = read_review_queue(path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to load review queue:\n{e}")
+                return
+            queue = [f for f in queue if os.path.exists(os.path.join(self.img_folder, f))]
+            if not queue:
+                QMessageBox.warning(self, "Warning", "None of the queued images are in the image folder")
+                return
+            self.img_files = queue
+            self.current_index = 0
+            self.load_image_and_labels()
+            QMessageBox.information(self, "Review Queue Loaded",
+                                    f"Reviewing {len(queue)} images, worst first.")
+
     def load_image_and_labels(self):
         if self.current_index < 0 or self.current_index >= len(self.img_files):
             self.img_rgb = None  # Clear image if index is invalid
@@ -301,6 +367,7 @@ class YOLOLabelEditor(QWidget):
             self.update_display()
             return
 
+        cv2 = lazy_cv2()
         img_path = os.path.join(self.img_folder, self.img_files[self.current_index])
         self.img = cv2.imread(img_path)
         if self.img is None:
@@ -358,6 +425,7 @@ class YOLOLabelEditor(QWidget):
             self.img_label.clear()
             return
 
+        cv2 = lazy_cv2()
         disp_img = self.img_rgb.copy()
 
         for i, (cls, x_c, y_c, bw, bh) in enumerate(self.boxes):
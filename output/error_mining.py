@@ -0,0 +1,75 @@
+import argparse
+import os
+
+from evaluator import EvalCache, collect_records
+
+# A class mismatch usually means a wrong label, so it outweighs a plain miss/extra
+MISSED_WEIGHT = 1.0
+EXTRA_WEIGHT = 1.0
+MISMATCH_WEIGHT = 2.0
+
+
+def score_record(record):
+    # Counts disagreements from the confusion pairs (predicted, true), -1 = background
+    missed = extra = mismatch = 0
+    for pred, true in record["cm_pairs"]:
+        if pred == -1:
+            missed += 1
+        elif true == -1:
+            extra += 1
+        elif pred != true:
+            mismatch += 1
+    score = MISSED_WEIGHT * missed + EXTRA_WEIGHT * extra + MISMATCH_WEIGHT * mismatch
+    return score, missed, extra, mismatch
+
+
+def rank_images(records):
+    # [(img_file, score, missed, extra, mismatch)] worst first, ties by name
+    ranked = [(img_file,) + score_record(record) for img_file, record in records.items()]
+    ranked.sort(key=lambda row: (-row[1], row[0]))
+    return ranked
+
+
+def write_review_queue(ranked, path, include_clean=False):
+    # Tab separated so file names with spaces survive; the editor reads the first column
+    with open(path, 'w') as f:
+        f.write("# image\tscore\tmissed\textra\tclass_mismatch\n")
+        for img_file, score, missed, extra, mismatch in ranked:
+            if score <= 0 and not include_clean:
+                continue
+            f.write(f"{img_file}\t{score:g}\t{missed}\t{extra}\t{mismatch}\n")
+
+
+def read_review_queue(path):
+    with open(path, 'r') as f:
+        return [line.rstrip("\n").split("\t")[0] for line in f
+                if line.strip() and not line.startswith("#")]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rank images by disagreement between labels and model predictions")
+    parser.add_argument("--images", default="images", help="Image folder")
+    parser.add_argument("--labels", default="labels", help="YOLO label folder")
+    parser.add_argument("--model", default="best.pt", help="Model weights")
+    parser.add_argument("--cache", default="eval_cache.json", help="Cache shared with evaluator.py")
+    parser.add_argument("--out", default="review_queue.txt", help="Queue file to open in the editor")
+    parser.add_argument("--all", action="store_true", help="Also list images with no disagreement")
+    parser.add_argument("--top", type=int, default=10, help="How many of the worst images to print")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    cache = EvalCache(args.cache)
+    records = collect_records(args.images, args.labels, args.model, cache)
+    cache.save()
+
+    ranked = rank_images(records)
+    write_review_queue(ranked, args.out, args.all)
+
+    flagged = sum(1 for row in ranked if row[1] > 0)
+    print(f"{flagged} / {len(ranked)} images need review, queue written to {os.path.abspath(args.out)}")
+    for img_file, score, missed, extra, mismatch in ranked[:args.top]:
+        if score <= 0:
+            break
+        print(f"  {score:5g}  {img_file}  (missed {missed}, extra {extra}, class mismatch {mismatch})")
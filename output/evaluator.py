@@ -0,0 +1,427 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# Same class order as YOLOLabelEditor.label_classes
+LABEL_CLASSES = [
+    "AP_LOGO",
+    "BHS_LOGO",
+    "Sander",
+    "ISafe",
+    "Shirt",
+    "Spray",
+    "SprayMachine",
+]
+
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg')
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)  # mAP@0.5:0.95
+PRED_CONF = 0.001   # keep low-confidence predictions so the curves reach recall 1
+CM_CONF = 0.25      # confidence / IoU used for the confusion matrix
+CM_IOU = 0.45
+CACHE_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Hashing and cache
+# ---------------------------------------------------------------------------
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EvalCache:
+    """JSON cache of file hashes, model predictions and per-image match results.
+
+    Predictions are keyed by model hash + image hash, so they survive label
+    edits and are only recomputed when the weights or the image change.
+    Match results are keyed by image name and remember which label/prediction
+    they were computed from.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {"version": CACHE_VERSION, "hashes": {}, "predictions": {}, "matches": {}}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self.data = data
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable cache {path}: {e}")
+
+    def hash(self, path):
+        # Re-hash only when size or mtime changed since the last run
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.data["hashes"].get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        digest = file_hash(path)
+        self.data["hashes"][key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+
+# ---------------------------------------------------------------------------
+# Labels and predictions
+# ---------------------------------------------------------------------------
+
+def read_label_file(lbl_path):
+    # Returns (classes (n,), boxes (n, 4) as normalized xywh), same parsing as the editor
+    rows = []
+    if os.path.exists(lbl_path):
+        with open(lbl_path, 'r') as f:
+            for line in f:
+                parts = line.strip().split()
+                if len(parts) == 5:
+                    rows.append([float(p) for p in parts])
+    arr = np.array(rows, dtype=np.float64).reshape(-1, 5)
+    return arr[:, 0].astype(int), arr[:, 1:]
+
+
+class Predictor:
+    # Loads the YOLO model on first use so fully cached runs never import ultralytics
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.model = None
+
+    def __call__(self, img_path):
+        if self.model is None:
+            from ultralytics import YOLO
+            self.model = YOLO(self.model_path)
+        result = self.model.predict(img_path, conf=PRED_CONF, verbose=False)[0]
+        boxes = result.boxes
+        cls = boxes.cls.cpu().numpy()
+        conf = boxes.conf.cpu().numpy()
+        xywhn = boxes.xywhn.cpu().numpy()
+        return [[int(c), float(s)] + [float(v) for v in b] for c, s, b in zip(cls, conf, xywhn)]
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def xywh2xyxy(boxes):
+    xy = boxes[:, :2]
+    half = boxes[:, 2:4] / 2
+    return np.concatenate((xy - half, xy + half), axis=1)
+
+
+def box_iou(boxes1, boxes2, eps=1e-9):
+    # Pairwise IoU of xyxy boxes, (n, 4) x (m, 4) -> (n, m)
+    lt = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    rb = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area1 = (boxes1[:, 2:] - boxes1[:, :2]).prod(axis=1)
+    area2 = (boxes2[:, 2:] - boxes2[:, :2]).prod(axis=1)
+    return inter / (area1[:, None] + area2[None, :] - inter + eps)
+
+
+def unique_matches(iou, mask):
+    # Greedy one-to-one matching of (true, pred) pairs where mask is set, best IoU first
+    pairs = np.argwhere(mask)
+    if pairs.shape[0] > 1:
+        pairs = pairs[iou[pairs[:, 0], pairs[:, 1]].argsort()[::-1]]
+        pairs = pairs[np.unique(pairs[:, 1], return_index=True)[1]]
+        pairs = pairs[iou[pairs[:, 0], pairs[:, 1]].argsort()[::-1]]
+        pairs = pairs[np.unique(pairs[:, 0], return_index=True)[1]]
+    return pairs
+
+
+def match_predictions(pred_cls, true_cls, iou):
+    # (n_pred, n_thresholds) bool: prediction is a true positive at each IoU threshold
+    correct = np.zeros((len(pred_cls), len(IOU_THRESHOLDS)), dtype=bool)
+    if not len(pred_cls) or not len(true_cls):
+        return correct
+    iou = iou * (true_cls[:, None] == pred_cls[None, :])
+    for i, t in enumerate(IOU_THRESHOLDS):
+        pairs = unique_matches(iou, iou >= t)
+        if pairs.shape[0]:
+            correct[pairs[:, 1], i] = True
+    return correct
+
+
+def confusion_pairs(pred_cls, true_cls, iou):
+    # List of (predicted, true) class pairs, -1 meaning background
+    pairs = unique_matches(iou, iou > CM_IOU) if iou.size else np.zeros((0, 2), dtype=int)
+    matched_true = np.full(len(true_cls), -1)
+    matched_true[pairs[:, 0]] = pairs[:, 1]
+    matched_pred = np.zeros(len(pred_cls), dtype=bool)
+    matched_pred[pairs[:, 1]] = True
+
+    out = [[int(pred_cls[j]) if j >= 0 else -1, int(c)] for j, c in zip(matched_true, true_cls)]
+    out += [[int(c), -1] for c in pred_cls[~matched_pred]]
+    return out
+
+
+def evaluate_image(preds, true_cls, true_boxes):
+    preds = np.array(preds, dtype=np.float64).reshape(-1, 6)
+    pred_cls = preds[:, 0].astype(int)
+    conf = preds[:, 1]
+    iou = box_iou(xywh2xyxy(true_boxes), xywh2xyxy(preds[:, 2:]))
+
+    cm_keep = conf >= CM_CONF
+    return {
+        "tp": match_predictions(pred_cls, true_cls, iou).astype(int).tolist(),
+        "conf": conf.tolist(),
+        "pred_cls": pred_cls.tolist(),
+        "target_cls": true_cls.tolist(),
+        "cm_pairs": confusion_pairs(pred_cls[cm_keep], true_cls, iou[:, cm_keep]),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def _trapezoid(y, x):
+    integrate = getattr(np, "trapezoid", None) or np.trapz
+    return integrate(y, x)
+
+
+def compute_ap(recall, precision):
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precision, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    x = np.linspace(0, 1, 101)  # 101-point interpolation (COCO)
+    return _trapezoid(np.interp(x, mrec, mpre), x), mpre, mrec
+
+
+def ap_per_class(tp, conf, pred_cls, target_cls, eps=1e-16):
+    order = np.argsort(-conf)
+    tp, conf, pred_cls = tp[order], conf[order], pred_cls[order]
+
+    classes, n_targets = np.unique(target_cls, return_counts=True)
+    px = np.linspace(0, 1, 1000)
+    ap = np.zeros((len(classes), tp.shape[1]))
+    p_curve = np.zeros((len(classes), 1000))
+    r_curve = np.zeros((len(classes), 1000))
+    pr_curve = np.zeros((len(classes), 1000))
+
+    for ci, c in enumerate(classes):
+        i = pred_cls == c
+        if not i.any():
+            continue
+        tpc = tp[i].cumsum(0)
+        fpc = (1 - tp[i]).cumsum(0)
+        recall = tpc / (n_targets[ci] + eps)
+        precision = tpc / (tpc + fpc)
+        r_curve[ci] = np.interp(-px, -conf[i], recall[:, 0], left=0)
+        p_curve[ci] = np.interp(-px, -conf[i], precision[:, 0], left=1)
+        for j in range(tp.shape[1]):
+            ap[ci, j], mpre, mrec = compute_ap(recall[:, j], precision[:, j])
+            if j == 0:
+                pr_curve[ci] = np.interp(px, mrec, mpre)
+
+    f1_curve = 2 * p_curve * r_curve / (p_curve + r_curve + eps)
+    return {
+        "classes": classes,
+        "px": px,
+        "ap": ap,
+        "p_curve": p_curve,
+        "r_curve": r_curve,
+        "f1_curve": f1_curve,
+        "pr_curve": pr_curve,
+    }
+
+
+def build_confusion_matrix(records, nc):
+    # Rows are predicted classes, columns true classes; index nc is background
+    matrix = np.zeros((nc + 1, nc + 1))
+    pairs = np.array([p for r in records for p in r["cm_pairs"]], dtype=int).reshape(-1, 2)
+    pairs[pairs < 0] = nc
+    pairs = pairs[(pairs < nc + 1).all(axis=1)]
+    np.add.at(matrix, (pairs[:, 0], pairs[:, 1]), 1)
+    return matrix
+
+
+# ---------------------------------------------------------------------------
+# Plots (same file names as the training run)
+# ---------------------------------------------------------------------------
+
+def _class_name(names, c):
+    return names[c] if 0 <= c < len(names) else str(c)
+
+
+def plot_pr_curve(stats, names, save_path):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(1, 1, figsize=(9, 6), tight_layout=True)
+    px = stats["px"]
+    for ci, c in enumerate(stats["classes"]):
+        ax.plot(px, stats["pr_curve"][ci], linewidth=1,
+                label=f"{_class_name(names, c)} {stats['ap'][ci, 0]:.3f}")
+    if len(stats["classes"]):
+        ax.plot(px, stats["pr_curve"].mean(0), linewidth=3, color="blue",
+                label=f"all classes {stats['ap'][:, 0].mean():.3f} mAP@0.5")
+    ax.set_xlabel("Recall")
+    ax.set_ylabel("Precision")
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.legend(bbox_to_anchor=(1.04, 1), loc="upper left")
+    ax.set_title("Precision-Recall Curve")
+    fig.savefig(save_path, dpi=250)
+    plt.close(fig)
+
+
+def plot_mc_curve(stats, key, names, save_path, ylabel):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(1, 1, figsize=(9, 6), tight_layout=True)
+    px, py = stats["px"], stats[key]
+    for ci, c in enumerate(stats["classes"]):
+        ax.plot(px, py[ci], linewidth=1, label=_class_name(names, c))
+    if len(stats["classes"]):
+        y = py.mean(0)
+        ax.plot(px, y, linewidth=3, color="blue",
+                label=f"all classes {y.max():.2f} at {px[y.argmax()]:.3f}")
+    ax.set_xlabel("Confidence")
+    ax.set_ylabel(ylabel)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.legend(bbox_to_anchor=(1.04, 1), loc="upper left")
+    ax.set_title(f"{ylabel}-Confidence Curve")
+    fig.savefig(save_path, dpi=250)
+    plt.close(fig)
+
+
+def plot_confusion_matrix(matrix, names, save_path, normalize):
+    import matplotlib.pyplot as plt
+
+    if normalize:
+        matrix = matrix / (matrix.sum(0).reshape(1, -1) + 1e-9)
+    labels = list(names) + ["background"]
+    fig, ax = plt.subplots(1, 1, figsize=(12, 9), tight_layout=True)
+    im = ax.imshow(matrix, cmap="Blues", vmin=0.0)
+    fig.colorbar(im, ax=ax)
+    fmt = "{:.2f}" if normalize else "{:.0f}"
+    threshold = matrix.max() / 2 if matrix.size else 0
+    for i in range(matrix.shape[0]):
+        for j in range(matrix.shape[1]):
+            if matrix[i, j] > 0.005:
+                ax.text(j, i, fmt.format(matrix[i, j]), ha="center", va="center", fontsize=8,
+                        color="white" if matrix[i, j] > threshold else "black")
+    ax.set_xticks(range(len(labels)))
+    ax.set_yticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=90)
+    ax.set_yticklabels(labels)
+    ax.set_xlabel("True")
+    ax.set_ylabel("Predicted")
+    ax.set_title("Confusion Matrix Normalized" if normalize else "Confusion Matrix")
+    fig.savefig(save_path, dpi=250)
+    plt.close(fig)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def collect_records(img_folder, lbl_folder, model_path, cache):
+    # Returns {image name: match record}, recomputing only images whose label,
+    # image or model changed since the cached run
+    predictor = Predictor(model_path)
+    model_hash = cache.hash(model_path)
+    img_files = sorted(f for f in os.listdir(img_folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+    predictions = cache.data["predictions"]
+    matches = cache.data["matches"]
+    records = {}
+    n_predicted = n_matched = 0
+
+    for img_file in img_files:
+        img_path = os.path.join(img_folder, img_file)
+        lbl_path = os.path.join(lbl_folder, os.path.splitext(img_file)[0] + ".txt")
+        pred_key = f"{model_hash}:{cache.hash(img_path)}"
+        label_hash = cache.hash(lbl_path) if os.path.exists(lbl_path) else None
+
+        record = matches.get(img_file)
+        if record and record["pred_key"] == pred_key and record["label_hash"] == label_hash:
+            records[img_file] = record
+            continue
+
+        if pred_key not in predictions:
+            predictions[pred_key] = predictor(img_path)
+            n_predicted += 1
+        true_cls, true_boxes = read_label_file(lbl_path)
+        record = evaluate_image(predictions[pred_key], true_cls, true_boxes)
+        record["pred_key"] = pred_key
+        record["label_hash"] = label_hash
+        matches[img_file] = record
+        records[img_file] = record
+        n_matched += 1
+
+    # Forget images that were deleted from the folder
+    for img_file in set(matches) - set(records):
+        del matches[img_file]
+
+    print(f"{len(img_files)} images: {n_matched} re-evaluated, {n_predicted} sent to the model")
+    return records
+
+
+def run_evaluation(img_folder, lbl_folder, model_path, out_dir, label_classes, cache_path=None):
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    cache = EvalCache(cache_path or os.path.join(out_dir, "eval_cache.json"))
+    records = list(collect_records(img_folder, lbl_folder, model_path, cache).values())
+    cache.save()
+
+    def stack(key, dtype, width=None):
+        rows = [np.array(r[key], dtype=dtype).reshape(-1, width) if width else np.array(r[key], dtype=dtype)
+                for r in records]
+        if rows:
+            return np.concatenate(rows)
+        return np.zeros((0, width), dtype=dtype) if width else np.zeros(0, dtype=dtype)
+
+    stats = ap_per_class(stack("tp", np.float64, len(IOU_THRESHOLDS)), stack("conf", np.float64),
+                         stack("pred_cls", int), stack("target_cls", int))
+    matrix = build_confusion_matrix(records, len(label_classes))
+
+    plot_pr_curve(stats, label_classes, os.path.join(out_dir, "BoxPR_curve.png"))
+    plot_mc_curve(stats, "f1_curve", label_classes, os.path.join(out_dir, "BoxF1_curve.png"), "F1")
+    plot_mc_curve(stats, "p_curve", label_classes, os.path.join(out_dir, "BoxP_curve.png"), "Precision")
+    plot_mc_curve(stats, "r_curve", label_classes, os.path.join(out_dir, "BoxR_curve.png"), "Recall")
+    plot_confusion_matrix(matrix, label_classes, os.path.join(out_dir, "confusion_matrix.png"), False)
+    plot_confusion_matrix(matrix, label_classes, os.path.join(out_dir, "confusion_matrix_normalized.png"), True)
+
+    ap = stats["ap"]
+    if len(ap):
+        print(f"mAP50: {ap[:, 0].mean():.4f}  mAP50-95: {ap.mean():.4f}")
+    print(f"Evaluation finished in {time.perf_counter() - start:.2f}s")
+    return stats, matrix
+
+
+def load_classes(path):
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate validation plots from cached predictions")
+    parser.add_argument("--images", default="images", help="Image folder")
+    parser.add_argument("--labels", default="labels", help="YOLO label folder")
+    parser.add_argument("--model", default="best.pt", help="Model weights")
+    parser.add_argument("--out", default=".", help="Where plots and eval_cache.json are written")
+    parser.add_argument("--classes", default=None, help="Classes file (one name per line)")
+    parser.add_argument("--cache", default=None, help="Cache file (default: <out>/eval_cache.json)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    classes = load_classes(args.classes) if args.classes else LABEL_CLASSES
+    run_evaluation(args.images, args.labels, args.model, args.out, classes, args.cache)